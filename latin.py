@@ -5,8 +5,14 @@ Latin Ain't This Insufferable Normally
 Full-featured interpreter with loops, functions, and more arithmetic.
 """
 
+import atexit
+import operator
+import os
 import re
+import stat
 import sys
+from collections import deque
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 
@@ -24,21 +30,27 @@ class RomanNumeralParser:
         'M': 1000, 'D': 500, 'C': 100, 'L': 50,
         'X': 10, 'V': 5, 'I': 1
     }
+    ROMAN_CHARS = frozenset(ROMAN_VALUES)
+    ROMAN_PATTERN = re.compile(r'[MDCLXVI]+')
+    
+    # Numeral values indexed by character code (0 for non-numerals)
+    _VALUES_BY_ORD = [0] * 128
+    for _char, _value in ROMAN_VALUES.items():
+        _VALUES_BY_ORD[ord(_char)] = _value
+    del _char, _value
     
     @classmethod
     def parse(cls, roman: str) -> Optional[int]:
         """Convert a Roman numeral string to an integer."""
-        if not roman:
+        if not roman or not cls.ROMAN_CHARS.issuperset(roman):
             return None
         
+        values_by_ord = cls._VALUES_BY_ORD
         total = 0
         prev_value = 0
         
         for char in reversed(roman):
-            if char not in cls.ROMAN_VALUES:
-                return None
-            
-            value = cls.ROMAN_VALUES[char]
+            value = values_by_ord[ord(char)]
             if value < prev_value:
                 total -= value
             else:
@@ -47,26 +59,22 @@ class RomanNumeralParser:
         
         return total if total > 0 else None
     
+    # Numerals for each decimal digit of the hundreds, tens and ones places
+    _HUNDREDS = ('', 'C', 'CC', 'CCC', 'CD', 'D', 'DC', 'DCC', 'DCCC', 'CM')
+    _TENS = ('', 'X', 'XX', 'XXX', 'XL', 'L', 'LX', 'LXX', 'LXXX', 'XC')
+    _ONES = ('', 'I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX')
+    
+    # Loops tend to print and concatenate the same small numbers over and over
     @classmethod
+    @lru_cache(maxsize=4096)
     def to_roman(cls, num: int) -> str:
         """Convert an integer to Roman numeral string."""
         if num <= 0:
             return "NIHIL"  # "nothing" in Latin
         
-        values = [
-            (1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'),
-            (100, 'C'), (90, 'XC'), (50, 'L'), (40, 'XL'),
-            (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')
-        ]
-        
-        result = []
-        for value, numeral in values:
-            count = num // value
-            if count:
-                result.append(numeral * count)
-                num -= value * count
-        
-        return ''.join(result)
+        thousands, rest = divmod(num, 1000)
+        return ('M' * thousands + cls._HUNDREDS[rest // 100]
+                + cls._TENS[rest // 10 % 10] + cls._ONES[rest % 10])
 
 
 class LatinDeclension:
@@ -125,17 +133,94 @@ class LatinDeclension:
         'DIES': {'gen': 'DIEI', 'acc': 'DIEM', 'dat': 'DIEI', 'abl': 'DIE', 'voc': 'DIES'},
     }
     
+    # Declension patterns guessed from the ending of an unknown noun:
+    # ending -> (letters to strip from the nominative, case endings).
+    # An ending of None means the case is spelled like the nominative.
+    _SUFFIX_RULES = {
+        # Second declension masculine like NUMERUS
+        'US': (2, {'gen': 'I', 'acc': 'UM', 'dat': 'O', 'abl': 'O', 'voc': 'E'}),
+        # Third declension like ADDITOR, ERROR
+        'OR': (0, {'gen': 'IS', 'acc': 'EM', 'dat': 'I', 'abl': 'E', 'voc': None}),
+        # Third declension like EXCEPTIO
+        'IO': (0, {'gen': 'NIS', 'acc': 'NEM', 'dat': 'NI', 'abl': 'NE', 'voc': None}),
+        # First declension feminine like SUMMA
+        'A': (1, {'gen': 'AE', 'acc': 'AM', 'dat': 'AE', 'abl': 'A', 'voc': 'A'}),
+        # Second declension neuter
+        'VM': (2, {'gen': 'I', 'acc': None, 'dat': 'O', 'abl': 'O', 'voc': None}),
+        'UM': (2, {'gen': 'I', 'acc': None, 'dat': 'O', 'abl': 'O', 'voc': None}),
+    }
+    # Default to second declension masculine pattern
+    _DEFAULT_RULE = (0, {'gen': 'I', 'acc': 'M', 'dat': 'O', 'abl': 'O', 'voc': 'E'})
+    
+    # Reverse lookup from any declined form to its nominative
+    _FORM_TO_NOM: Dict[str, str] = {}
+    
+    # Prefix tree over the nominatives. Nodes are dicts keyed by character; the
+    # '' key holds (table position, nominative) for a nominative ending there.
+    _NOMINATIVE_TRIE: Dict[str, dict] = {}
+    
+    @classmethod
+    def _build_inverse(cls):
+        """Build the declined form -> nominative lookup table."""
+        cls._FORM_TO_NOM = {nom: nom for nom in cls.DECLENSIONS}
+        for nom, forms in cls.DECLENSIONS.items():
+            cls._add_inverse(nom, forms)
+    
+    @classmethod
+    def _add_inverse(cls, nom: str, forms: Dict[str, str]):
+        """Add the forms of one noun to the reverse lookup table."""
+        # Nominatives always map to themselves; otherwise the first noun wins
+        cls._FORM_TO_NOM[nom] = nom
+        for form in forms.values():
+            cls._FORM_TO_NOM.setdefault(form, nom)
+    
+    @classmethod
+    def _index_nominative(cls, nominative: str, position: int):
+        """Add a nominative and its position in the table to the prefix tree."""
+        node = cls._NOMINATIVE_TRIE
+        for char in nominative:
+            node = node.setdefault(char, {})
+        node.setdefault('', (position, nominative))
+    
+    @classmethod
+    def _build_nominative_index(cls):
+        """Index every nominative in the table."""
+        for position, nominative in enumerate(cls.DECLENSIONS):
+            cls._index_nominative(nominative, position)
+    
+    @classmethod
+    def add_regular_noun(cls, nominative: str) -> Dict[str, str]:
+        """Add a noun missing from the table, guessing its declension from its ending."""
+        rule = (cls._SUFFIX_RULES.get(nominative[-2:]) or cls._SUFFIX_RULES.get(nominative[-1:])
+                or cls._DEFAULT_RULE)
+        strip, endings = rule
+        root = nominative[:len(nominative) - strip]
+        forms = {case: nominative if ending is None else root + ending
+                 for case, ending in endings.items()}
+        cls.DECLENSIONS[nominative] = forms
+        cls._add_inverse(nominative, forms)
+        cls._index_nominative(nominative, len(cls.DECLENSIONS) - 1)
+        return forms
+    
+    @classmethod
+    def match_nominative(cls, text: str, pos: int) -> Optional[str]:
+        """Get the first nominative in the table that text starts with at pos."""
+        # Walk every nominative that is a prefix here and keep the earliest in the table
+        best = None
+        node = cls._NOMINATIVE_TRIE
+        for i in range(pos, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            entry = node.get('')
+            if entry is not None and (best is None or entry < best):
+                best = entry
+        return best[1] if best else None
+    
     @classmethod
     def get_nominative(cls, declined_form: str) -> Optional[str]:
         """Get the nominative form of a declined noun."""
-        if declined_form in cls.DECLENSIONS:
-            return declined_form
-        
-        for nom, forms in cls.DECLENSIONS.items():
-            if declined_form in forms.values():
-                return nom
-        
-        return None
+        return cls._FORM_TO_NOM.get(declined_form)
     
     @classmethod
     def get_accusative(cls, nominative: str) -> Optional[str]:
@@ -163,133 +248,160 @@ class LatinDeclension:
         return cls.DECLENSIONS.get(nominative, {}).get('gen')
 
 
+LatinDeclension._build_inverse()
+LatinDeclension._build_nominative_index()
+
+
+class _TrieNode:
+    """Node of the prefix tree used by the tokenizer for longest-match lookups."""
+    
+    __slots__ = ('children', 'keyword', 'variable')
+    
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.keyword: Optional[Tuple[str, any]] = None  # Keyword or NIHIL token ending here
+        self.variable: Optional[Tuple[str, str]] = None  # VARIABLE/GENITIVE token ending here
+    
+    def insert(self, word: str) -> '_TrieNode':
+        """Insert a word and return the node where it ends."""
+        node = self
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        return node
+
+
 class Tokenizer:
     """Tokenize LATIN source code."""
     
     KEYWORDS = ['SIT', 'EST', 'SI', 'ALITER', 'FINIS', 'SCRIBE', 'LEGO', 'ADDE', 'DEME', 'AEQUAT', 
                 'DUM', 'FAC', 'REDDO', 'VOCA', 'DVCE', 'MVLTIPLICA', 'MAIVS', 'MINOR', 'IVNGE',
                 'INCIPITCVM', 'FINITVRCVM', 'CONTINET', 'INDICEDE', 'IACE', 'CAPE', 'AVDI', 'NOTA']
+    KEYWORD_PATTERN = re.compile('|'.join(sorted(map(re.escape, KEYWORDS), key=len, reverse=True)))
+    _KEYWORD_FIRST_CHARS = frozenset(keyword[0] for keyword in KEYWORDS)
+    # Shared token tuples, so tokenizing a keyword or NIHIL allocates nothing
+    KEYWORD_TOKENS = {keyword: ('KEYWORD', keyword) for keyword in KEYWORDS}
+    NIHIL_TOKEN = ('NUMBER', 0)
     
     def __init__(self, declared_vars: set):
         self.declared_vars = declared_vars
+        # Prefix tree over keywords, NIHIL and every form of every declared variable.
+        # Matches are always anchored at the current position, so a single descent
+        # finds the longest match; this is faster than a regex alternation over all
+        # forms and needs no third-party multi-pattern matcher.
+        self._form_trie = _TrieNode()
+        for keyword, token in self.KEYWORD_TOKENS.items():
+            self._form_trie.insert(keyword).keyword = token
+        self._form_trie.insert('NIHIL').keyword = self.NIHIL_TOKEN
+        for var in declared_vars:
+            self._insert_variable(var)
     
-    def tokenize_line(self, line: str) -> List[Tuple[str, str]]:
-        """Tokenize a single line of LATIN code."""
-        # Remove comments
-        if ';' in line:
-            line = line.split(';')[0]
+    def declare(self, var_name: str):
+        """Declare a variable so its declined forms are recognized."""
+        self.declared_vars.add(var_name)
+        self._insert_variable(var_name)
+    
+    def _insert_variable(self, var: str):
+        """Add the nominative and declined forms of a variable to the trie."""
+        # One token tuple per variable and kind, shared by all of its forms
+        variable_token = ('VARIABLE', var)
+        genitive_token = ('GENITIVE', var)
+        # A form spelled like a genitive is still read as a plain variable
+        forms = [(variable_token, var),
+                 (variable_token, LatinDeclension.get_accusative(var)),
+                 (variable_token, LatinDeclension.get_dative(var)),
+                 (variable_token, LatinDeclension.get_ablative(var)),
+                 (variable_token, LatinDeclension.get_vocative(var)),
+                 (genitive_token, LatinDeclension.get_genitive(var))]
+        for token, form in forms:
+            if not form:
+                continue
+            node = self._form_trie.insert(form)
+            if node.variable is None or (node.variable[0] == 'GENITIVE' and token is variable_token):
+                node.variable = token
+    
+    def _match_forms(self, line: str, pos: int):
+        """Find the longest keyword and the longest variable form starting at pos.
         
+        Returns (keyword_token, keyword_end, variable_token, variable_end).
+        """
+        keyword = variable = None
+        keyword_end = variable_end = pos
+        node = self._form_trie
+        i = pos
+        length = len(line)
+        while i < length:
+            node = node.children.get(line[i])
+            if node is None:
+                break
+            i += 1
+            if node.keyword is not None:
+                keyword, keyword_end = node.keyword, i
+            if node.variable is not None:
+                variable, variable_end = node.variable, i
+        return keyword, keyword_end, variable, variable_end
+    
+    def _keyword_at(self, line: str, pos: int) -> bool:
+        """Check whether a keyword starts at pos."""
+        return (pos < len(line) and line[pos] in self._KEYWORD_FIRST_CHARS
+                and self.KEYWORD_PATTERN.match(line, pos) is not None)
+    
+    def tokenize_line(self, line: str) -> List[Tuple[str, str]]:
+        """Tokenize a single line of LATIN code (comments already removed)."""
         line = line.strip()
         if not line:
             return []
         
         tokens = []
+        append = tokens.append
+        match_forms = self._match_forms
+        roman_chars = RomanNumeralParser.ROMAN_CHARS
+        length = len(line)
         pos = 0
         
-        while pos < len(line):
-            matched = False
-            
+        while pos < length:
             # Try to match string literals (quoted text)
             if line[pos] == '"':
                 end_quote = line.find('"', pos + 1)
                 if end_quote == -1:
                     raise RuntimeError(f"ERRATUM: unclosed string literal")
                 string_content = line[pos + 1:end_quote]
-                tokens.append(('STRING', string_content))
+                append(('STRING', string_content))
                 pos = end_quote + 1
                 continue
             
-            # Try to match keywords
-            for keyword in self.KEYWORDS:
-                if line[pos:].startswith(keyword):
-                    tokens.append(('KEYWORD', keyword))
-                    pos += len(keyword)
-                    matched = True
-                    break
+            keyword, keyword_end, best_match, best_end = match_forms(line, pos)
             
-            if matched:
+            # Keywords (and NIHIL) take precedence over variable names
+            if keyword:
+                append(keyword)
+                pos = keyword_end
+                
                 # Special handling for SIT - next token is a new variable name
-                if tokens[-1] == ('KEYWORD', 'SIT'):
-                    remaining = line[pos:]
-                    found_var = None
+                if keyword is self.KEYWORD_TOKENS['SIT']:
                     # First try to find in DECLENSIONS table
-                    for nom in LatinDeclension.DECLENSIONS.keys():
-                        if remaining.startswith(nom):
-                            found_var = nom
-                            break
-                    
+                    found_var = LatinDeclension.match_nominative(line, pos)
                     if found_var:
-                        tokens.append(('VARIABLE', found_var))
+                        append(('VARIABLE', found_var))
                         pos += len(found_var)
                     else:
                         # Variable not in declensions - parse as uppercase letters
                         end = pos
-                        while end < len(line) and line[end].isupper():
+                        while end < length and line[end].isupper():
                             end += 1
                         if end > pos:
                             var_name = line[pos:end]
-                            tokens.append(('VARIABLE', var_name))
+                            append(('VARIABLE', var_name))
                             pos = end
-                    continue
-                
                 continue
             
-            # Try to match NIHIL (zero)
-            if line[pos:].startswith('NIHIL'):
-                tokens.append(('NUMBER', 0))
-                pos += 5
-                continue
-            
-            # Try to match variable names first (to avoid M in MAXIMVS being parsed as 1000)
-            best_match = None
-            best_length = 0
-            
-            for var in self.declared_vars:
-                # Check nominative
-                if line[pos:].startswith(var):
-                    if len(var) > best_length:
-                        best_match = ('VARIABLE', var)
-                        best_length = len(var)
-                
-                # Check accusative
-                acc = LatinDeclension.get_accusative(var)
-                if acc and line[pos:].startswith(acc):
-                    if len(acc) > best_length:
-                        best_match = ('VARIABLE', var)
-                        best_length = len(acc)
-                
-                # Check dative
-                dat = LatinDeclension.get_dative(var)
-                if dat and line[pos:].startswith(dat):
-                    if len(dat) > best_length:
-                        best_match = ('VARIABLE', var)
-                        best_length = len(dat)
-                
-                # Check ablative
-                abl = LatinDeclension.get_ablative(var)
-                if abl and line[pos:].startswith(abl):
-                    if len(abl) > best_length:
-                        best_match = ('VARIABLE', var)
-                        best_length = len(abl)
-                
-                # Check vocative
-                voc = LatinDeclension.get_vocative(var)
-                if voc and line[pos:].startswith(voc):
-                    if len(voc) > best_length:
-                        best_match = ('VARIABLE', var)
-                        best_length = len(voc)
-                
-                # Check genitive (for field access like NOMENSERVII)
-                gen = LatinDeclension.get_genitive(var)
-                if gen and line[pos:].startswith(gen):
-                    if len(gen) > best_length:
-                        best_match = ('GENITIVE', var)  # Mark as genitive for field access
-                        best_length = len(gen)
-            
+            # Variable names are tried before Roman numerals (to avoid M in MAXIMVS being parsed as 1000)
             if best_match:
+                best_length = best_end - pos
                 # Check if next token would be a keyword - if so, prefer shorter variable match
-                remaining_after = line[pos + best_length:]
-                keyword_after = any(remaining_after.startswith(kw) for kw in self.KEYWORDS)
+                keyword_after = self._keyword_at(line, pos + best_length)
                 
                 if not keyword_after and best_length > 0:
                     # Try shorter matches to see if they would allow a keyword
@@ -297,28 +409,22 @@ class Tokenizer:
                     nom_len = len(var_name)
                     
                     # If we matched a declined form, check if nominative + keyword would work
-                    if best_length > nom_len and line[pos:].startswith(var_name):
-                        remaining_with_nom = line[pos + nom_len:]
-                        if any(remaining_with_nom.startswith(kw) for kw in self.KEYWORDS):
+                    if best_length > nom_len and line.startswith(var_name, pos):
+                        if self._keyword_at(line, pos + nom_len):
                             # Use nominative match instead
                             best_length = nom_len
                 
-                tokens.append(best_match)
+                append(best_match)
                 pos += best_length
                 continue
             
             # Try to match Roman numerals (only if no variable matched)
-            roman_match = ''
-            temp_pos = pos
-            while temp_pos < len(line) and line[temp_pos] in 'MDCLXVI':
-                roman_match += line[temp_pos]
-                temp_pos += 1
-            
-            if roman_match:
-                num = RomanNumeralParser.parse(roman_match)
+            if line[pos] in roman_chars:
+                roman_match = RomanNumeralParser.ROMAN_PATTERN.match(line, pos)
+                num = RomanNumeralParser.parse(roman_match.group())
                 if num is not None:
-                    tokens.append(('NUMBER', num))
-                    pos = temp_pos
+                    append(('NUMBER', num))
+                    pos = roman_match.end()
                     continue
             
             # Unknown token - error
@@ -327,14 +433,52 @@ class Tokenizer:
         return tokens
 
 
+# Opcodes for compiled lines, indexes into LatinInterpreter._DISPATCH
+(OP_NOP, OP_FINIS, OP_SIT, OP_SCRIBE, OP_AVDI, OP_NOTA, OP_LEGO, OP_IACE, OP_CAPE,
+ OP_FAC, OP_REDDO, OP_DUM, OP_ALITER, OP_SI, OP_FIELD_EST, OP_EST, OP_SET_VALUE,
+ OP_COPY_VARIABLE, OP_UNKNOWN) = range(19)
+
+
 class LatinInterpreter:
     """Interpret and execute LATIN programs."""
     
+    __slots__ = ('variables', 'declared_vars', 'tokenizer', '_op_cache', 'use_english_errors',
+                 'lines', 'line_index', 'loop_starts', 'block_depth',
+                 'functions', 'call_stack', 'in_function_def', 'exception_handlers',
+                 '_handlers_by_name', 'current_exception', 'exception_throw_line',
+                 'skip_handler_pop', '_batch_input', '_stdin_lines', '_block_end', '_cape_end',
+                 '_fac_end', '_else_line')
+    
+    COMMENT_PATTERN = re.compile(r';.*$', re.M)
+    
+    # Line prefixes that block skips count as opening a nested block
+    BLOCK_PREFIX_PATTERN = re.compile(r'SI|DUM|CAPE|FAC')
+    # Openers for SI/DUM/ALITER skips; CAPE and FAC skips also count their own keyword
+    _SKIP_OPENERS = frozenset(('SI', 'DUM'))
+    
+    # Keywords after EST that compare or search strings
+    _STRING_OPS = frozenset(('INCIPITCVM', 'FINITVRCVM', 'CONTINET', 'INDICEDE'))
+    
+    # Keywords after EST that do arithmetic, with the operation each performs
+    _ARITHMETIC_OPS = {'ADDE': operator.add, 'DEME': operator.sub,
+                       'MVLTIPLICA': operator.mul, 'DVCE': operator.floordiv}
+    
+    # Comparison keywords in SI and DUM conditions
+    _COMPARISONS = {'AEQUAT': operator.eq, 'MAIVS': operator.gt, 'MINOR': operator.lt}
+    
+    # Opcodes for lines that start with a statement keyword
+    _KEYWORD_OPS = {
+        'FINIS': OP_FINIS, 'SIT': OP_SIT, 'SCRIBE': OP_SCRIBE, 'AVDI': OP_AVDI,
+        'NOTA': OP_NOTA, 'LEGO': OP_LEGO, 'IACE': OP_IACE, 'CAPE': OP_CAPE,
+        'FAC': OP_FAC, 'REDDO': OP_REDDO, 'DUM': OP_DUM, 'ALITER': OP_ALITER,
+        'SI': OP_SI,
+    }
+    
     def __init__(self, use_english_errors=False):
         self.variables: Dict[str, any] = {}  # Can hold int or str
         self.declared_vars: set = set()
         self.tokenizer = Tokenizer(self.declared_vars)
-        self.skip_execution = False
+        self._op_cache: Dict[str, Tuple[int, List[Tuple[str, str]]]] = {}  # Source line -> (opcode, tokens)
         self.use_english_errors = use_english_errors
         self.lines = []
         self.line_index = 0
@@ -344,9 +488,17 @@ class LatinInterpreter:
         self.call_stack = []  # Stack of return addresses and saved variables
         self.in_function_def = False  # Track if we're currently defining a function
         self.exception_handlers = []  # Stack of (exception_type, handler_line) tuples
+        self._handlers_by_name: Dict[str, List[int]] = {}  # exception_type -> stack of handler lines
         self.current_exception = None  # Currently thrown exception
         self.exception_throw_line = None  # Line where exception was thrown
         self.skip_handler_pop = False  # Don't pop handler when FINIS balances a skip
+        # Read stdin in one go; never in the REPL, and decided on first LEGO under run()
+        self._batch_input: Optional[bool] = False
+        self._stdin_lines: Optional[deque] = None  # Remaining piped input lines
+        self._block_end: List[int] = []  # Line -> FINIS that DUM/SI/ALITER skips to
+        self._cape_end: List[int] = []  # Line -> FINIS that CAPE skips to
+        self._fac_end: List[int] = []  # Line -> FINIS that ends a FAC body
+        self._else_line: List[Optional[int]] = []  # Line -> ALITER that a false SI jumps to
     
     def error(self, latin_msg: str, english_msg: str):
         """Raise error in Latin or English based on settings."""
@@ -357,15 +509,19 @@ class LatinInterpreter:
     
     def run(self, source: str):
         """Execute LATIN source code."""
-        self.lines = source.split('\n')
+        # Remove comments from the whole program once, up front
+        source = self.COMMENT_PATTERN.sub('', source)
+        self.lines = lines = [line.strip() for line in source.split('\n')]
+        self.index_blocks()
+        # A program may slurp its input; the first LEGO checks whether stdin allows it
+        self._batch_input = None
+        num_lines = len(lines)
+        op_cache = self._op_cache
+        compile_line = self.compile_line
+        dispatch = self._DISPATCH
         self.line_index = 0
-        
-        while self.line_index < len(self.lines):
-            line = self.lines[self.line_index].strip()
-            
-            # Remove inline comments
-            if ';' in line:
-                line = line.split(';')[0].strip()
+        while self.line_index < num_lines:
+            line = lines[self.line_index]
             
             # Skip empty lines
             if not line:
@@ -373,7 +529,14 @@ class LatinInterpreter:
                 continue
             
             try:
-                jump = self.execute_line(line)
+                # Lines are compiled on first use: how a line tokenizes
+                # depends on the variables SIT has declared so far
+                op = op_cache.get(line)
+                if op is None:
+                    op = op_cache[line] = compile_line(line)
+                # Same as execute_op, without the extra call per line
+                opcode, tokens = op
+                jump = dispatch[opcode](self, tokens)
                 if jump is not None:
                     self.line_index = jump
                 else:
@@ -386,653 +549,601 @@ class LatinInterpreter:
                 print(f"Error on line {self.line_index + 1}: {e}", file=sys.stderr)
                 sys.exit(1)
     
+    @staticmethod
+    def _line_kind(line: str) -> Optional[str]:
+        """Classify a line for block skips: FINIS, ALITER, an opening prefix, or None."""
+        if line == 'FINIS' or line == 'ALITER':
+            return line
+        match = LatinInterpreter.BLOCK_PREFIX_PATTERN.match(line)
+        return match.group() if match else None
+    
+    @staticmethod
+    def _scan_blocks(kinds: List[Optional[str]], openers: frozenset, stop_at_aliter: bool = False) -> List[Optional[int]]:
+        """For each line, find where a block skip starting there would stop.
+        
+        A skip scans the following lines, counting lines whose kind is one of
+        the openers as nested blocks, and stops at the FINIS that closes the
+        current block (or at an ALITER on the same level, if asked). Returns
+        None for lines whose skip would run off the end of the program.
+        """
+        num_lines = len(kinds)
+        # close[i] and stop[i]: where a scan entered at line i stops
+        close: List[Optional[int]] = [None] * (num_lines + 1)
+        stop = [None] * (num_lines + 1) if stop_at_aliter else close
+        for i in range(num_lines - 1, -1, -1):
+            kind = kinds[i]
+            if kind in openers:
+                # Skip the nested block, then carry on at this level
+                inner = close[i + 1]
+                if inner is not None:
+                    close[i] = close[inner + 1]
+                    if stop_at_aliter:
+                        stop[i] = stop[inner + 1]
+            elif kind == 'FINIS':
+                close[i] = i
+                if stop_at_aliter:
+                    stop[i] = i
+            else:
+                close[i] = close[i + 1]
+                if stop_at_aliter:
+                    stop[i] = i if kind == 'ALITER' else stop[i + 1]
+        # Skips start on the line after the block keyword
+        return stop[1:]
+    
+    def index_blocks(self):
+        """Precompute the jump targets of block skips for the loaded lines."""
+        # Classify every line once; the scans below only compare kinds
+        kinds = [self._line_kind(line) for line in self.lines]
+        last_line = len(kinds) - 1
+        
+        def targets(openers):
+            # A skip that finds no FINIS stops on the last line
+            return [last_line if end is None else end for end in self._scan_blocks(kinds, openers)]
+        
+        self._block_end = targets(self._SKIP_OPENERS)
+        self._cape_end = targets(self._SKIP_OPENERS | {'CAPE'})
+        self._fac_end = targets(self._SKIP_OPENERS | {'FAC'})
+        self._else_line = [end if end is not None and kinds[end] == 'ALITER' else None
+                           for end in self._scan_blocks(kinds, self._SKIP_OPENERS, stop_at_aliter=True)]
+    
     def execute_line(self, line: str) -> Optional[int]:
         """Execute a single line. Returns new line number if jump, else None."""
+        # Shares run()'s cache, so a repeated REPL line is not tokenized again
+        op = self._op_cache.get(line)
+        if op is None:
+            op = self._op_cache[line] = self.compile_line(line)
+        return self.execute_op(op)
+    
+    def compile_line(self, line: str) -> Tuple[int, List[Tuple[str, str]]]:
+        """Tokenize a line and classify it as an (opcode, tokens) pair."""
         tokens = self.tokenizer.tokenize_line(line)
-        
+        return self._opcode(tokens), tokens
+    
+    def _opcode(self, tokens: List[Tuple[str, str]]) -> int:
+        """Classify a tokenized line by the statement it contains."""
         if not tokens:
-            return None
+            return OP_NOP
+        kind, value = tokens[0]
+        if kind == 'KEYWORD':
+            return self._KEYWORD_OPS.get(value, OP_UNKNOWN)
+        if len(tokens) >= 3 and kind == 'VARIABLE':
+            if tokens[1][0] == 'GENITIVE' and tokens[2] == ('KEYWORD', 'EST'):
+                return OP_FIELD_EST
+            if tokens[1] == ('KEYWORD', 'EST'):
+                # Plain stores get their own handlers
+                if len(tokens) == 3:
+                    source_type = tokens[2][0]
+                    if source_type == 'STRING' or source_type == 'NUMBER':
+                        return OP_SET_VALUE
+                    if source_type == 'VARIABLE':
+                        return OP_COPY_VARIABLE
+                return OP_EST
+        return OP_UNKNOWN
+    
+    def execute_op(self, op: Tuple[int, List[Tuple[str, str]]]) -> Optional[int]:
+        """Execute a compiled line. Returns new line number if jump, else None."""
+        opcode, tokens = op
+        return self._DISPATCH[opcode](self, tokens)
+    
+    def _do_nop(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle an empty line."""
+        return None
+    
+    def _do_finis(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle FINIS (end block)."""
+        self.block_depth -= 1
         
-        # Handle FINIS (end block)
-        if tokens[0] == ('KEYWORD', 'FINIS'):
-            self.skip_execution = False
-            self.block_depth -= 1
-            
-            # Pop exception handler if this closes a CAPE block (but not if we're just balancing a skip)
-            if self.skip_handler_pop:
-                # Just balancing a CAPE skip - don't pop handler
-                self.skip_handler_pop = False
-            elif self.exception_handlers and self.exception_handlers[-1][1] <= self.line_index:
-                self.exception_handlers.pop()
-                # If we just handled an exception, end execution (jump past all lines)
-                if self.exception_throw_line is not None:
-                    self.exception_throw_line = None
-                    self.current_exception = None
-                    return len(self.lines)  # Jump past end to terminate
-            
-            # If this ends a loop (depth returns to loop start depth), jump back
-            if self.loop_starts and self.loop_starts[-1][1] == self.block_depth:
-                loop_start, _ = self.loop_starts.pop()
-                self.block_depth += 1  # Re-enter the loop
-                return loop_start
-            return None
+        # Pop exception handler if this closes a CAPE block (but not if we're just balancing a skip)
+        if self.skip_handler_pop:
+            # Just balancing a CAPE skip - don't pop handler
+            self.skip_handler_pop = False
+        elif self.exception_handlers and self.exception_handlers[-1][1] <= self.line_index:
+            handler_type, _ = self.exception_handlers.pop()
+            handler_lines = self._handlers_by_name[handler_type]
+            handler_lines.pop()
+            if not handler_lines:
+                del self._handlers_by_name[handler_type]
+            # If we just handled an exception, end execution (jump past all lines)
+            if self.exception_throw_line is not None:
+                self.exception_throw_line = None
+                self.current_exception = None
+                return len(self.lines)  # Jump past end to terminate
         
-        # Skip execution if in false conditional or loop condition
-        if self.skip_execution:
-            return None
+        # If this ends a loop (depth returns to loop start depth), jump back
+        if self.loop_starts and self.loop_starts[-1][1] == self.block_depth:
+            loop_start, _ = self.loop_starts.pop()
+            self.block_depth += 1  # Re-enter the loop
+            return loop_start
+        return None
+    
+    def _do_sit(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle SIT (variable declaration)."""
+        if len(tokens) != 2 or tokens[1][0] != 'VARIABLE':
+            self.error("Syntax incorrecta post SIT", "Invalid syntax after SIT")
+        # Intern the name so every token, table and dict key shares one string object
+        var_name = sys.intern(tokens[1][1])
+        self.variables[var_name] = 0  # Default to 0 for compatibility
         
-        # Handle SIT (variable declaration)
-        if tokens[0] == ('KEYWORD', 'SIT'):
-            if len(tokens) != 2 or tokens[1][0] != 'VARIABLE':
-                self.error("Syntax incorrecta post SIT", "Invalid syntax after SIT")
-            var_name = tokens[1][1]
-            self.declared_vars.add(var_name)
-            self.variables[var_name] = 0  # Default to 0 for compatibility
-            
-            # If variable not in DECLENSIONS, add it with automatic declension pattern
-            if var_name not in LatinDeclension.DECLENSIONS:
-                # Guess declension based on ending
-                if var_name.endswith('US'):
-                    # Second declension masculine like NUMERUS
-                    root = var_name[:-2]
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': root + 'I',
-                        'acc': root + 'UM',
-                        'dat': root + 'O',
-                        'abl': root + 'O',
-                        'voc': root + 'E'
-                    }
-                elif var_name.endswith('OR'):
-                    # Third declension like ADDITOR, ERROR
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': var_name + 'IS',
-                        'acc': var_name + 'EM',
-                        'dat': var_name + 'I',
-                        'abl': var_name + 'E',
-                        'voc': var_name
-                    }
-                elif var_name.endswith('IO'):
-                    # Third declension like EXCEPTIO
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': var_name + 'NIS',
-                        'acc': var_name + 'NEM',
-                        'dat': var_name + 'NI',
-                        'abl': var_name + 'NE',
-                        'voc': var_name
-                    }
-                elif var_name.endswith('A'):
-                    # First declension feminine like SUMMA
-                    root = var_name[:-1]
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': root + 'AE',
-                        'acc': root + 'AM',
-                        'dat': root + 'AE',
-                        'abl': root + 'A',
-                        'voc': root + 'A'
-                    }
-                elif var_name.endswith('VM') or var_name.endswith('UM'):
-                    # Second declension neuter
-                    root = var_name[:-2]
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': root + 'I',
-                        'acc': var_name,
-                        'dat': root + 'O',
-                        'abl': root + 'O',
-                        'voc': var_name
-                    }
-                else:
-                    # Default to second declension masculine pattern
-                    LatinDeclension.DECLENSIONS[var_name] = {
-                        'gen': var_name + 'I',
-                        'acc': var_name + 'M',
-                        'dat': var_name + 'O',
-                        'abl': var_name + 'O',
-                        'voc': var_name + 'E'
-                    }
-            
-            return None
+        # If variable not in DECLENSIONS, add it with automatic declension pattern
+        if var_name not in LatinDeclension.DECLENSIONS:
+            LatinDeclension.add_regular_noun(var_name)
+        self.tokenizer.declare(var_name)
+        # The new variable can change how any line tokenizes
+        self._op_cache.clear()
         
-        # Handle SCRIBE (print)
-        if tokens[0] == ('KEYWORD', 'SCRIBE'):
-            # SCRIBE FIELDGENITIVE (print field of object)
-            if len(tokens) == 3 and tokens[1][0] == 'VARIABLE' and tokens[2][0] == 'GENITIVE':
-                field_name = tokens[1][1]
-                object_name = tokens[2][1]
-                if object_name not in self.variables:
-                    self.error(f"'{object_name}' non declaratur", f"Object '{object_name}' not declared")
-                if not isinstance(self.variables[object_name], dict):
-                    self.error(f"'{object_name}' non est structura", f"'{object_name}' is not a struct")
-                if field_name not in self.variables[object_name]:
-                    self.error(f"Campus '{field_name}' in '{object_name}' non existit", 
-                              f"Field '{field_name}' in '{object_name}' does not exist")
-                value = self.variables[object_name][field_name]
-                if isinstance(value, int):
-                    print(RomanNumeralParser.to_roman(value))
-                else:
-                    print(value)
-                return None
-                
-            if len(tokens) != 2:
-                self.error("Syntax incorrecta post SCRIBE", "Invalid syntax after SCRIBE")
-            if tokens[1][0] == 'STRING':
-                print(tokens[1][1])
-            elif tokens[1][0] == 'NUMBER':
-                print(RomanNumeralParser.to_roman(tokens[1][1]))
-            elif tokens[1][0] == 'VARIABLE':
-                var_name = tokens[1][1]
-                if var_name not in self.variables:
-                    self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-                value = self.variables[var_name]
-                if isinstance(value, int):
-                    print(RomanNumeralParser.to_roman(value))
-                else:
-                    print(value)
+        return None
+    
+    def _format_value(self, value) -> str:
+        """Format a runtime value for output (integers as Roman numerals)."""
+        if isinstance(value, int):
+            return RomanNumeralParser.to_roman(value)
+        return str(value)
+    
+    def _emit(self, token: Tuple[str, str], stream, prefix: str = ""):
+        """Write a string, number or variable token to a stream on its own line."""
+        if prefix:
+            stream.write(prefix)
+        token_type, token_value = token
+        if token_type == 'STRING':
+            text = token_value
+        elif token_type == 'NUMBER':
+            text = RomanNumeralParser.to_roman(token_value)
+        elif token_type == 'VARIABLE':
+            text = self._format_value(self._variable_value(token_value))
+        else:
+            return
+        stream.write(text + '\n')
+    
+    def _do_scribe(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle SCRIBE (print)."""
+        # SCRIBE FIELDGENITIVE (print field of object)
+        if len(tokens) == 3 and tokens[1][0] == 'VARIABLE' and tokens[2][0] == 'GENITIVE':
+            field_name = tokens[1][1]
+            object_name = tokens[2][1]
+            if object_name not in self.variables:
+                self.error(f"'{object_name}' non declaratur", f"Object '{object_name}' not declared")
+            if not isinstance(self.variables[object_name], dict):
+                self.error(f"'{object_name}' non est structura", f"'{object_name}' is not a struct")
+            if field_name not in self.variables[object_name]:
+                self.error(f"Campus '{field_name}' in '{object_name}' non existit", 
+                          f"Field '{field_name}' in '{object_name}' does not exist")
+            sys.stdout.write(self._format_value(self.variables[object_name][field_name]) + '\n')
             return None
+            
+        if len(tokens) != 2:
+            self.error("Syntax incorrecta post SCRIBE", "Invalid syntax after SCRIBE")
+        self._emit(tokens[1], sys.stdout)
+        return None
+    
+    def _do_avdi(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle AVDI (debug print - with DEBUG prefix)."""
+        if len(tokens) != 2:
+            self.error("Syntax incorrecta post AVDI", "Invalid syntax after AVDI")
+        self._emit(tokens[1], sys.stderr, "[DEBUG] ")
+        return None
+    
+    def _do_nota(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle NOTA (log print - with LOG prefix)."""
+        if len(tokens) != 2:
+            self.error("Syntax incorrecta post NOTA", "Invalid syntax after NOTA")
+        self._emit(tokens[1], sys.stderr, "[LOG] ")
+        return None
+    
+    def _do_lego(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle LEGO (read input)."""
+        if len(tokens) != 2:
+            self.error("Syntax incorrecta post LEGO", "Invalid syntax after LEGO")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("LEGO requirit variabilem", "LEGO requires a variable")
         
-        # Handle AVDI (debug print - with DEBUG prefix)
-        if tokens[0] == ('KEYWORD', 'AVDI'):
-            if len(tokens) != 2:
-                self.error("Syntax incorrecta post AVDI", "Invalid syntax after AVDI")
-            print("[DEBUG] ", end="", file=sys.stderr)
-            if tokens[1][0] == 'STRING':
-                print(tokens[1][1], file=sys.stderr)
-            elif tokens[1][0] == 'NUMBER':
-                print(RomanNumeralParser.to_roman(tokens[1][1]), file=sys.stderr)
-            elif tokens[1][0] == 'VARIABLE':
-                var_name = tokens[1][1]
-                if var_name not in self.variables:
-                    self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-                value = self.variables[var_name]
-                if isinstance(value, int):
-                    print(RomanNumeralParser.to_roman(value), file=sys.stderr)
-                else:
-                    print(value, file=sys.stderr)
-            return None
+        var_name = tokens[1][1]
+        if var_name not in self.variables:
+            self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
         
-        # Handle NOTA (log print - with LOG prefix)
-        if tokens[0] == ('KEYWORD', 'NOTA'):
-            if len(tokens) != 2:
-                self.error("Syntax incorrecta post NOTA", "Invalid syntax after NOTA")
-            print("[LOG] ", end="", file=sys.stderr)
-            if tokens[1][0] == 'STRING':
-                print(tokens[1][1], file=sys.stderr)
-            elif tokens[1][0] == 'NUMBER':
-                print(RomanNumeralParser.to_roman(tokens[1][1]), file=sys.stderr)
-            elif tokens[1][0] == 'VARIABLE':
-                var_name = tokens[1][1]
-                if var_name not in self.variables:
-                    self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-                value = self.variables[var_name]
-                if isinstance(value, int):
-                    print(RomanNumeralParser.to_roman(value), file=sys.stderr)
-                else:
-                    print(value, file=sys.stderr)
-            return None
+        # Read input from user
+        user_input = self.read_input().strip()
         
-        # Handle LEGO (read input)
-        if tokens[0] == ('KEYWORD', 'LEGO'):
-            if len(tokens) != 2:
-                self.error("Syntax incorrecta post LEGO", "Invalid syntax after LEGO")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("LEGO requirit variabilem", "LEGO requires a variable")
-            
-            var_name = tokens[1][1]
-            if var_name not in self.variables:
-                self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-            
-            # Read input from user
-            user_input = input().strip()
-            
-            # Try to parse as Roman numeral first
-            value = RomanNumeralParser.parse(user_input)
-            if value is not None:
-                self.variables[var_name] = value
-            else:
-                # If not a valid Roman numeral, treat as string
-                # Remove quotes if user included them
-                if user_input.startswith('"') and user_input.endswith('"'):
-                    user_input = user_input[1:-1]
-                self.variables[var_name] = user_input
-            
-            return None
+        # Try to parse as Roman numeral first
+        value = RomanNumeralParser.parse(user_input)
+        if value is not None:
+            self.variables[var_name] = value
+        else:
+            # If not a valid Roman numeral, treat as string
+            # Remove quotes if user included them
+            if user_input.startswith('"') and user_input.endswith('"'):
+                user_input = user_input[1:-1]
+            self.variables[var_name] = user_input
         
-        # Handle IACE (throw exception)
-        if tokens[0] == ('KEYWORD', 'IACE'):
-            # IACE ERROR "message" or IACE ERROR
-            if len(tokens) < 2:
-                self.error("IACE requirit nomen exceptionis", "IACE requires exception name")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("IACE requirit nomen exceptionis in vocativo", "IACE requires exception name in vocative")
-            
-            exception_name = tokens[1][1]
-            message = ""
-            if len(tokens) == 3 and tokens[2][0] == 'STRING':
-                message = tokens[2][1]
-            
-            # Store exception info and throw line
-            self.current_exception = {'type': exception_name, 'message': message}
-            self.exception_throw_line = self.line_index + 1  # Continue after this line when done handling
-            
-            # Look for exception handler
-            for handler_type, handler_line in reversed(self.exception_handlers):
-                if handler_type == exception_name:
-                    # Jump to handler
-                    return handler_line
-            
-            # No handler found - raise error
-            if message:
-                self.error(f"{exception_name}: {message}", f"{exception_name}: {message}")
-            else:
-                self.error(exception_name, exception_name)
-            
-            return None
+        return None
+    
+    def read_input(self) -> str:
+        """Read one line of user input for LEGO."""
+        if self._batch_input is None:
+            # Only a regular file can be slurped safely; a pipe may be interactive
+            try:
+                self._batch_input = stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode)
+            except (AttributeError, OSError, ValueError):
+                self._batch_input = False  # No usable stdin
+        if not self._batch_input:
+            if sys.stdin is None:
+                raise EOFError("EOF when reading a line")
+            return input()
+        if self._stdin_lines is None:
+            lines = sys.stdin.read().split('\n')
+            if not lines[-1]:
+                lines.pop()  # Nothing after the final newline
+            self._stdin_lines = deque(lines)
+        if not self._stdin_lines:
+            raise EOFError("EOF when reading a line")
+        return self._stdin_lines.popleft()
+    
+    def _do_iace(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle IACE (throw exception)."""
+        # IACE ERROR "message" or IACE ERROR
+        if len(tokens) < 2:
+            self.error("IACE requirit nomen exceptionis", "IACE requires exception name")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("IACE requirit nomen exceptionis in vocativo", "IACE requires exception name in vocative")
         
-        # Handle CAPE (catch exception)
-        if tokens[0] == ('KEYWORD', 'CAPE'):
-            # CAPE ERROR
-            if len(tokens) != 2:
-                self.error("CAPE requirit nomen exceptionis", "CAPE requires exception name")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("CAPE requirit nomen exceptionis in vocativo", "CAPE requires exception name in vocative")
-            
-            exception_name = tokens[1][1]
-            
-            # Register exception handler (will be active until FINIS)
-            self.exception_handlers.append((exception_name, self.line_index + 1))
+        exception_name = tokens[1][1]
+        message = ""
+        if len(tokens) == 3 and tokens[2][0] == 'STRING':
+            message = tokens[2][1]
+        
+        # Store exception info and throw line
+        self.current_exception = {'type': exception_name, 'message': message}
+        self.exception_throw_line = self.line_index + 1  # Continue after this line when done handling
+        
+        # Look for exception handler
+        handler_line = self.find_handler(exception_name)
+        if handler_line is not None:
+            # Jump to handler
+            return handler_line
+        
+        # No handler found - raise error
+        if message:
+            self.error(f"{exception_name}: {message}", f"{exception_name}: {message}")
+        else:
+            self.error(exception_name, exception_name)
+        
+        return None
+    
+    def _do_cape(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle CAPE (catch exception)."""
+        # CAPE ERROR
+        if len(tokens) != 2:
+            self.error("CAPE requirit nomen exceptionis", "CAPE requires exception name")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("CAPE requirit nomen exceptionis in vocativo", "CAPE requires exception name in vocative")
+        
+        exception_name = tokens[1][1]
+        
+        # Register exception handler (will be active until FINIS)
+        self.exception_handlers.append((exception_name, self.line_index + 1))
+        self._handlers_by_name.setdefault(exception_name, []).append(self.line_index + 1)
+        self.block_depth += 1
+        
+        # If we're entering the handler after an exception, clear it
+        if self.current_exception and self.current_exception['type'] == exception_name:
+            self.current_exception = None
+        else:
+            # Not handling an exception now, skip to FINIS
+            # Balance for FINIS
             self.block_depth += 1
-            
-            # If we're entering the handler after an exception, clear it
-            if self.current_exception and self.current_exception['type'] == exception_name:
-                self.current_exception = None
-            else:
-                # Not handling an exception now, skip to FINIS
-                depth = 1
-                search_idx = self.line_index + 1
-                while search_idx < len(self.lines) and depth > 0:
-                    search_line = self.lines[search_idx].strip()
-                    if ';' in search_line:
-                        search_line = search_line.split(';')[0].strip()
-                    if search_line.startswith('CAPE') or search_line.startswith('SI') or search_line.startswith('DUM'):
-                        depth += 1
-                    elif search_line == 'FINIS':
-                        depth -= 1
-                    search_idx += 1
-                # Balance for FINIS
-                self.block_depth += 1
-                self.skip_handler_pop = True  # Don't pop handler, we want it to stay active
-                return search_idx - 1
-            
-            return None
+            self.skip_handler_pop = True  # Don't pop handler, we want it to stay active
+            return self._cape_end[self.line_index]
         
-        # Handle FAC (function definition)
-        if tokens[0] == ('KEYWORD', 'FAC'):
-            # FAC FUNCTION_NAME PARAM1 PARAM2 ...
-            if len(tokens) < 2:
-                self.error("FAC requirit nomen functionis", "FAC requires function name")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("FAC requirit nomen functionis validum", "FAC requires valid function name")
-            
-            func_name = tokens[1][1]
-            params = []
-            
-            # Collect parameters (all should be variables in dative case)
-            for i in range(2, len(tokens)):
-                if tokens[i][0] != 'VARIABLE':
-                    self.error("Parametri debent esse variabiles", "Parameters must be variables")
-                params.append(tokens[i][1])
-            
-            # Find the matching FINIS for this function
-            depth = 1
-            search_idx = self.line_index + 1
-            while search_idx < len(self.lines) and depth > 0:
-                search_line = self.lines[search_idx].strip()
-                if ';' in search_line:
-                    search_line = search_line.split(';')[0].strip()
-                if search_line.startswith('FAC') or search_line.startswith('SI') or search_line.startswith('DUM'):
-                    depth += 1
-                elif search_line == 'FINIS':
-                    depth -= 1
-                search_idx += 1
-            
-            # Store function definition
-            self.functions[func_name] = {
-                'params': params,
-                'start_line': self.line_index + 1,
-                'end_line': search_idx - 2  # -2 because search_idx is after FINIS
-            }
-            
-            # Skip to FINIS (don't execute function body during definition)
-            self.block_depth += 1  # Balance for FINIS
-            return search_idx - 1
-        
-        # Handle REDDO (return from function)
-        if tokens[0] == ('KEYWORD', 'REDDO'):
-            if len(tokens) != 2:
-                self.error("REDDO requirit valorem", "REDDO requires a value")
-            
-            # Get return value
-            if tokens[1][0] == 'NUMBER':
-                return_value = tokens[1][1]
-            elif tokens[1][0] == 'STRING':
-                return_value = tokens[1][1]
-            elif tokens[1][0] == 'VARIABLE':
-                var_name = tokens[1][1]
-                if var_name not in self.variables:
-                    self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-                return_value = self.variables[var_name]
-            else:
-                self.error("REDDO requirit numerum, textum, aut variabilem", "REDDO requires number, string, or variable")
-            
-            # Pop call stack and restore context
-            if not self.call_stack:
-                self.error("REDDO extra functionem", "REDDO outside function")
-            
-            call_info = self.call_stack.pop()
-            return_line = call_info['return_line']
-            saved_vars = call_info['saved_vars']
-            
-            # If there was a calling variable, assign the return value to it
-            calling_var = self.variables.get('__CALLING_VAR__')
-            
-            # Restore variables (remove local params, restore globals)
-            self.variables = saved_vars.copy()
-            
-            # Assign return value to calling variable
-            if calling_var:
-                self.variables[calling_var] = return_value
-            
-            # Jump back to caller (next line after the call)
-            return return_line + 1
-        
-        # Handle DUM (while loop)
-        if tokens[0] == ('KEYWORD', 'DUM'):
-            # DUM VARIABLE COMPARISON VALUE
-            if len(tokens) != 4:
-                self.error("Syntax incorrecta in DUM", "Invalid DUM syntax")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("DUM requirit variabilem", "DUM requires variable")
-            if tokens[2][1] not in ['AEQUAT', 'MAIVS', 'MINOR']:
-                self.error("DUM requirit AEQUAT, MAIVS, aut MINOR", "DUM requires AEQUAT, MAIVS, or MINOR")
-            
+        return None
+    
+    def _do_fac(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle FAC (function definition)."""
+        # FAC FUNCTION_NAME PARAM1 PARAM2 ...
+        if len(tokens) < 2:
+            self.error("FAC requirit nomen functionis", "FAC requires function name")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("FAC requirit nomen functionis validum", "FAC requires valid function name")
+        
+        func_name = tokens[1][1]
+        params = []
+        
+        # Collect parameters (all should be variables in dative case)
+        for i in range(2, len(tokens)):
+            if tokens[i][0] != 'VARIABLE':
+                self.error("Parametri debent esse variabiles", "Parameters must be variables")
+            params.append(tokens[i][1])
+        
+        # Find the matching FINIS for this function
+        finis_line = self._fac_end[self.line_index]
+        
+        # Store function definition
+        self.functions[func_name] = {
+            'params': params,
+            'start_line': self.line_index + 1,
+            'end_line': finis_line - 1
+        }
+        
+        # Skip to FINIS (don't execute function body during definition)
+        self.block_depth += 1  # Balance for FINIS
+        return finis_line
+    
+    def _do_reddo(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle REDDO (return from function)."""
+        if len(tokens) != 2:
+            self.error("REDDO requirit valorem", "REDDO requires a value")
+        
+        # Get return value
+        if tokens[1][0] == 'NUMBER':
+            return_value = tokens[1][1]
+        elif tokens[1][0] == 'STRING':
+            return_value = tokens[1][1]
+        elif tokens[1][0] == 'VARIABLE':
             var_name = tokens[1][1]
-            if var_name not in self.variables:
-                self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-            
-            left_value = self.variables[var_name]
-            
-            if tokens[3][0] == 'NUMBER':
-                right_value = tokens[3][1]
-            elif tokens[3][0] == 'VARIABLE':
-                right_var = tokens[3][1]
-                if right_var not in self.variables:
-                    self.error(f"'{right_var}' non declaratur", f"Variable '{right_var}' not declared")
-                right_value = self.variables[right_var]
+            return_value = self._variable_value(var_name)
+        else:
+            self.error("REDDO requirit numerum, textum, aut variabilem", "REDDO requires number, string, or variable")
+        
+        # Pop call stack and restore context
+        if not self.call_stack:
+            self.error("REDDO extra functionem", "REDDO outside function")
+        
+        call_info = self.call_stack.pop()
+        return_line = call_info['return_line']
+        saved_vars = call_info['saved_vars']
+        
+        # The frame knows which variable this call's result goes to
+        calling_var = call_info['calling_var']
+        
+        # Restore variables (remove local params, restore globals); the
+        # snapshot belonged to this call alone, so no copy is needed
+        self.variables = saved_vars
+        
+        # Assign return value to calling variable
+        if calling_var:
+            self.variables[calling_var] = return_value
+        
+        # Jump back to caller (next line after the call)
+        return return_line + 1
+    
+    def _do_dum(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle DUM (while loop)."""
+        # DUM VARIABLE COMPARISON VALUE
+        if len(tokens) != 4:
+            self.error("Syntax incorrecta in DUM", "Invalid DUM syntax")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("DUM requirit variabilem", "DUM requires variable")
+        compare = self._COMPARISONS.get(tokens[2][1])
+        if compare is None:
+            self.error("DUM requirit AEQUAT, MAIVS, aut MINOR", "DUM requires AEQUAT, MAIVS, or MINOR")
+        
+        # Declared variables are read directly; a miss goes through the checked lookup
+        variables = self.variables
+        var_name = tokens[1][1]
+        if var_name in variables:
+            left_value = variables[var_name]
+        else:
+            left_value = self._variable_value(var_name)
+        
+        if tokens[3][0] == 'NUMBER':
+            right_value = tokens[3][1]
+        elif tokens[3][0] == 'VARIABLE':
+            right_var = tokens[3][1]
+            if right_var in variables:
+                right_value = variables[right_var]
             else:
-                self.error("DUM requirit numerum aut variabilem", "DUM requires number or variable")
-            
-            # Evaluate condition
-            condition_met = False
-            if tokens[2][1] == 'AEQUAT':
-                condition_met = (left_value == right_value)
-            elif tokens[2][1] == 'MAIVS':
-                condition_met = (left_value > right_value)
-            elif tokens[2][1] == 'MINOR':
-                condition_met = (left_value < right_value)
-            
-            # If condition is false, skip to FINIS
-            if not condition_met:
-                depth = 1
-                search_idx = self.line_index + 1
-                while search_idx < len(self.lines) and depth > 0:
-                    search_line = self.lines[search_idx].strip()
-                    if ';' in search_line:
-                        search_line = search_line.split(';')[0].strip()
-                    if search_line.startswith('DUM') or search_line.startswith('SI'):
-                        depth += 1
-                    elif search_line == 'FINIS':
-                        depth -= 1
-                    search_idx += 1
-                return search_idx - 1
-            # Otherwise continue into loop and remember start position with current depth
-            self.loop_starts.append((self.line_index, self.block_depth))
-            self.block_depth += 1
-            return None
+                right_value = self._variable_value(right_var)
+        else:
+            self.error("DUM requirit numerum aut variabilem", "DUM requires number or variable")
         
-        # Handle ALITER (else)
-        if tokens[0] == ('KEYWORD', 'ALITER'):
-            # When we reach ALITER, it means the SI condition was true
-            # So we need to skip to FINIS
-            depth = 1
-            search_idx = self.line_index + 1
-            while search_idx < len(self.lines) and depth > 0:
-                search_line = self.lines[search_idx].strip()
-                if ';' in search_line:
-                    search_line = search_line.split(';')[0].strip()
-                if search_line.startswith('SI') or search_line.startswith('DUM'):
-                    depth += 1
-                elif search_line == 'FINIS':
-                    depth -= 1
-                search_idx += 1
-            return search_idx - 1
-        
-        # Handle SI (conditional)
-        if tokens[0] == ('KEYWORD', 'SI'):
-            # Parse: SI VARIABLE AEQUAT NUMBER/VARIABLE/STRING
-            # Or: SI VARIABLE MAIVS/MINOR NUMBER/VARIABLE
-            if len(tokens) != 4:
-                self.error("Syntax incorrecta in SI", "Invalid SI syntax")
-            if tokens[1][0] != 'VARIABLE':
-                self.error("SI requirit variabilem", "SI requires variable")
-            if tokens[2][1] not in ['AEQUAT', 'MAIVS', 'MINOR']:
-                self.error("SI requirit AEQUAT, MAIVS, aut MINOR", "SI requires AEQUAT, MAIVS, or MINOR")
-            
-            var_name = tokens[1][1]
-            if var_name not in self.variables:
-                self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-            
-            left_value = self.variables[var_name]
-            
-            if tokens[3][0] == 'STRING':
-                right_value = tokens[3][1]
-            elif tokens[3][0] == 'NUMBER':
-                right_value = tokens[3][1]
-            elif tokens[3][0] == 'VARIABLE':
-                right_var = tokens[3][1]
-                if right_var not in self.variables:
-                    self.error(f"'{right_var}' non declaratur", f"Variable '{right_var}' not declared")
-                right_value = self.variables[right_var]
+        # If condition is false, skip to FINIS
+        if not compare(left_value, right_value):
+            return self._block_end[self.line_index]
+        # Otherwise continue into loop and remember start position with current depth
+        self.loop_starts.append((self.line_index, self.block_depth))
+        self.block_depth += 1
+        return None
+    
+    def _do_aliter(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle ALITER (else)."""
+        # When we reach ALITER, it means the SI condition was true
+        # So we need to skip to FINIS
+        return self._block_end[self.line_index]
+    
+    def _do_si(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle SI (conditional)."""
+        # Parse: SI VARIABLE AEQUAT NUMBER/VARIABLE/STRING
+        # Or: SI VARIABLE MAIVS/MINOR NUMBER/VARIABLE
+        if len(tokens) != 4:
+            self.error("Syntax incorrecta in SI", "Invalid SI syntax")
+        if tokens[1][0] != 'VARIABLE':
+            self.error("SI requirit variabilem", "SI requires variable")
+        comparison = tokens[2][1]
+        compare = self._COMPARISONS.get(comparison)
+        if compare is None:
+            self.error("SI requirit AEQUAT, MAIVS, aut MINOR", "SI requires AEQUAT, MAIVS, or MINOR")
+        
+        # Declared variables are read directly; a miss goes through the checked lookup
+        variables = self.variables
+        var_name = tokens[1][1]
+        if var_name in variables:
+            left_value = variables[var_name]
+        else:
+            left_value = self._variable_value(var_name)
+        
+        if tokens[3][0] == 'STRING':
+            right_value = tokens[3][1]
+        elif tokens[3][0] == 'NUMBER':
+            right_value = tokens[3][1]
+        elif tokens[3][0] == 'VARIABLE':
+            right_var = tokens[3][1]
+            if right_var in variables:
+                right_value = variables[right_var]
             else:
-                self.error("SI requirit numerum, textum, aut variabilem", "SI requires number, string, or variable")
-            
-            # Evaluate condition
-            condition_met = False
-            if tokens[2][1] == 'AEQUAT':
-                condition_met = (left_value == right_value)
-            elif tokens[2][1] == 'MAIVS':
-                # Only works with numbers
-                if not isinstance(left_value, int) or not isinstance(right_value, int):
-                    self.error("MAIVS requirit numeros", "MAIVS requires numbers")
-                condition_met = (left_value > right_value)
-            elif tokens[2][1] == 'MINOR':
-                # Only works with numbers
-                if not isinstance(left_value, int) or not isinstance(right_value, int):
-                    self.error("MINOR requirit numeros", "MINOR requires numbers")
-                condition_met = (left_value < right_value)
-            
-            if not condition_met:
-                # Skip to ALITER or FINIS (don't change depth since we're not entering the block)
-                depth = 1
-                search_idx = self.line_index + 1
-                while search_idx < len(self.lines) and depth > 0:
-                    search_line = self.lines[search_idx].strip()
-                    if ';' in search_line:
-                        search_line = search_line.split(';')[0].strip()
-                    if search_line.startswith('SI') or search_line.startswith('DUM'):
-                        depth += 1
-                    elif search_line == 'ALITER' and depth == 1:
-                        # Found ALITER at same depth - jump past it to continue with else block
-                        # Increment block_depth since we're entering the ALITER block
-                        self.block_depth += 1
-                        return search_idx + 1
-                    elif search_line == 'FINIS':
-                        depth -= 1
-                    search_idx += 1
-                # Jumped to FINIS - it will handle decrementing depth, so pre-increment to balance
+                right_value = self._variable_value(right_var)
+        else:
+            self.error("SI requirit numerum, textum, aut variabilem", "SI requires number, string, or variable")
+        
+        # MAIVS and MINOR only work with numbers
+        if compare is not operator.eq and not (isinstance(left_value, int) and isinstance(right_value, int)):
+            self.error(f"{comparison} requirit numeros", f"{comparison} requires numbers")
+        
+        if not compare(left_value, right_value):
+            # Skip to ALITER or FINIS (don't change depth since we're not entering the block)
+            aliter_line = self._else_line[self.line_index]
+            if aliter_line is not None:
+                # Found ALITER at same depth - jump past it to continue with else block
+                # Increment block_depth since we're entering the ALITER block
                 self.block_depth += 1
-                return search_idx - 1
-            # Condition is true, enter SI block
+                return aliter_line + 1
+            # Jumped to FINIS - it will handle decrementing depth, so pre-increment to balance
             self.block_depth += 1
+            return self._block_end[self.line_index]
+        # Condition is true, enter SI block
+        self.block_depth += 1
+        return None
+    
+    def _do_field_est(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle field assignment (FIELDGENITIVE EST ...)."""
+        # Example: NOMENSERVII EST "Marcus" (name of servant is Marcus)
+        field_name = tokens[0][1]  # NOMEN
+        object_name = tokens[1][1]  # SERVUS
+        
+        if object_name not in self.variables:
+            self.error(f"'{object_name}' non declaratur", f"Object '{object_name}' not declared")
+        
+        # Ensure the object is a dictionary (struct)
+        if not isinstance(self.variables[object_name], dict):
+            # Initialize as dict if it's not already
+            self.variables[object_name] = {}
+        
+        # Field assignment: FIELDGENITIVE EST STRING
+        if len(tokens) == 4 and tokens[3][0] == 'STRING':
+            self.variables[object_name][field_name] = tokens[3][1]
             return None
         
-        # Handle field assignment (FIELDGENITIVE EST ...)
-        # Example: NOMENSERVII EST "Marcus" (name of servant is Marcus)
-        if len(tokens) >= 3 and tokens[0][0] == 'VARIABLE' and tokens[1][0] == 'GENITIVE' and tokens[2] == ('KEYWORD', 'EST'):
-            field_name = tokens[0][1]  # NOMEN
-            object_name = tokens[1][1]  # SERVUS
-            
-            if object_name not in self.variables:
-                self.error(f"'{object_name}' non declaratur", f"Object '{object_name}' not declared")
-            
-            # Ensure the object is a dictionary (struct)
-            if not isinstance(self.variables[object_name], dict):
-                # Initialize as dict if it's not already
-                self.variables[object_name] = {}
-            
-            # Field assignment: FIELDGENITIVE EST STRING
-            if len(tokens) == 4 and tokens[3][0] == 'STRING':
-                self.variables[object_name][field_name] = tokens[3][1]
-                return None
-            
-            # Field assignment: FIELDGENITIVE EST NUMBER
-            if len(tokens) == 4 and tokens[3][0] == 'NUMBER':
-                self.variables[object_name][field_name] = tokens[3][1]
-                return None
-            
-            # Field assignment: FIELDGENITIVE EST VARIABLE
-            if len(tokens) == 4 and tokens[3][0] == 'VARIABLE':
-                source_var = tokens[3][1]
-                if source_var not in self.variables:
-                    self.error(f"'{source_var}' non declaratur", f"Variable '{source_var}' not declared")
-                self.variables[object_name][field_name] = self.variables[source_var]
-                return None
-            
-            # Field assignment: FIELDGENITIVE EST FIELD2GENITIVE2 (copy from another field)
-            if len(tokens) == 5 and tokens[3][0] == 'VARIABLE' and tokens[4][0] == 'GENITIVE':
-                source_field = tokens[3][1]
-                source_object = tokens[4][1]
-                if source_object not in self.variables:
-                    self.error(f"'{source_object}' non declaratur", f"Object '{source_object}' not declared")
-                if not isinstance(self.variables[source_object], dict):
-                    self.error(f"'{source_object}' non est structura", f"'{source_object}' is not a struct")
-                if source_field not in self.variables[source_object]:
-                    self.error(f"Campus '{source_field}' in '{source_object}' non existit", 
-                              f"Field '{source_field}' in '{source_object}' does not exist")
-                self.variables[object_name][field_name] = self.variables[source_object][source_field]
-                return None
-        
-        # Handle assignment (VARIABLE EST ...)
-        if len(tokens) >= 3 and tokens[0][0] == 'VARIABLE' and tokens[1] == ('KEYWORD', 'EST'):
-            var_name = tokens[0][1]
-            if var_name not in self.variables:
-                self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
-            
-            # Simple assignment: VARIABLE EST STRING
-            if len(tokens) == 3 and tokens[2][0] == 'STRING':
-                self.variables[var_name] = tokens[2][1]
-                return None
-            
-            # Simple assignment: VARIABLE EST NUMBER
-            if len(tokens) == 3 and tokens[2][0] == 'NUMBER':
-                self.variables[var_name] = tokens[2][1]
-                return None
-            
-            # VARIABLE EST VARIABLE
-            if len(tokens) == 3 and tokens[2][0] == 'VARIABLE':
-                source_var = tokens[2][1]
-                if source_var not in self.variables:
-                    self.error(f"'{source_var}' non declaratur", f"Variable '{source_var}' not declared")
-                self.variables[var_name] = self.variables[source_var]
-                return None
-            
-            # VARIABLE EST IVNGE ... (string concatenation)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'IVNGE'):
-                result = self.evaluate_concatenation(tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST INCIPITCVM ... (string startswith)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'INCIPITCVM'):
-                result = self.evaluate_string_operation('INCIPITCVM', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST FINITVRCVM ... (string endswith)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'FINITVRCVM'):
-                result = self.evaluate_string_operation('FINITVRCVM', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST CONTINET ... (string contains)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'CONTINET'):
-                result = self.evaluate_string_operation('CONTINET', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST INDICEDE ... (string indexof)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'INDICEDE'):
-                result = self.evaluate_string_operation('INDICEDE', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST ADDE ...
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'ADDE'):
-                result = self.evaluate_operation('ADDE', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST DEME ...
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'DEME'):
-                result = self.evaluate_operation('DEME', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST MVLTIPLICA ...
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'MVLTIPLICA'):
-                result = self.evaluate_operation('MVLTIPLICA', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST DVCE ...
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'DVCE'):
-                result = self.evaluate_operation('DVCE', tokens[3:])
-                self.variables[var_name] = result
-                return None
-            
-            # VARIABLE EST VOCA ... (function call)
-            if len(tokens) >= 4 and tokens[2] == ('KEYWORD', 'VOCA'):
-                # Mark that we're expecting a return value
-                self.variables['__CALLING_VAR__'] = var_name
-                # Call function and jump to it
-                jump_addr = self.call_function(tokens[3:])
-                return jump_addr
-            
+        # Field assignment: FIELDGENITIVE EST NUMBER
+        if len(tokens) == 4 and tokens[3][0] == 'NUMBER':
+            self.variables[object_name][field_name] = tokens[3][1]
+            return None
+        
+        # Field assignment: FIELDGENITIVE EST VARIABLE
+        if len(tokens) == 4 and tokens[3][0] == 'VARIABLE':
+            source_var = tokens[3][1]
+            self.variables[object_name][field_name] = self._variable_value(source_var)
+            return None
+        
+        # Field assignment: FIELDGENITIVE EST FIELD2GENITIVE2 (copy from another field)
+        if len(tokens) == 5 and tokens[3][0] == 'VARIABLE' and tokens[4][0] == 'GENITIVE':
+            source_field = tokens[3][1]
+            source_object = tokens[4][1]
+            if source_object not in self.variables:
+                self.error(f"'{source_object}' non declaratur", f"Object '{source_object}' not declared")
+            if not isinstance(self.variables[source_object], dict):
+                self.error(f"'{source_object}' non est structura", f"'{source_object}' is not a struct")
+            if source_field not in self.variables[source_object]:
+                self.error(f"Campus '{source_field}' in '{source_object}' non existit", 
+                          f"Field '{source_field}' in '{source_object}' does not exist")
+            self.variables[object_name][field_name] = self.variables[source_object][source_field]
+            return None
+        
+        self.error("Syntax non cognita", "Unknown syntax")
+    
+    def _do_est(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle assignment (VARIABLE EST ...)."""
+        var_name = tokens[0][1]
+        if var_name not in self.variables:
+            self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
+        
+        source_type, source_value = tokens[2]
+        
+        if len(tokens) == 3 or source_type != 'KEYWORD':
             self.error("Syntax incorrecta in assignatione", "Invalid assignment syntax")
         
+        # VARIABLE EST IVNGE ... (string concatenation)
+        if source_value == 'IVNGE':
+            result = self.evaluate_concatenation(tokens[3:])
+            self.variables[var_name] = result
+            return None
+        
+        # VARIABLE EST INCIPITCVM/FINITVRCVM/CONTINET/INDICEDE ... (string startswith/endswith/contains/indexof)
+        if source_value in self._STRING_OPS:
+            result = self.evaluate_string_operation(source_value, tokens[3:])
+            self.variables[var_name] = result
+            return None
+        
+        # VARIABLE EST ADDE/DEME/MVLTIPLICA/DVCE ...
+        if source_value in self._ARITHMETIC_OPS:
+            result = self.evaluate_operation(source_value, tokens[3:])
+            self.variables[var_name] = result
+            return None
+        
+        # VARIABLE EST VOCA ... (function call)
+        if source_value == 'VOCA':
+            # Call function and jump to it; its REDDO assigns to var_name
+            jump_addr = self.call_function(tokens[3:], var_name)
+            return jump_addr
+        
+        self.error("Syntax incorrecta in assignatione", "Invalid assignment syntax")
+    
+    def _do_set_value(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle assignment of a literal (VARIABLE EST STRING / VARIABLE EST NUMBER)."""
+        var_name = tokens[0][1]
+        if var_name not in self.variables:
+            self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
+        self.variables[var_name] = tokens[2][1]
+        return None
+    
+    def _do_copy_variable(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle assignment of another variable (VARIABLE EST VARIABLE)."""
+        var_name = tokens[0][1]
+        if var_name not in self.variables:
+            self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
+        self.variables[var_name] = self._variable_value(tokens[2][1])
+        return None
+    
+    def _do_unknown(self, tokens: List[Tuple[str, str]]) -> Optional[int]:
+        """Handle a line that is not a known statement."""
         self.error("Syntax non cognita", "Unknown syntax")
     
+    # Handlers indexed by opcode
+    _DISPATCH = (_do_nop, _do_finis, _do_sit, _do_scribe, _do_avdi, _do_nota, _do_lego,
+                 _do_iace, _do_cape, _do_fac, _do_reddo, _do_dum, _do_aliter, _do_si,
+                 _do_field_est, _do_est, _do_set_value, _do_copy_variable, _do_unknown)
+    
     def evaluate_concatenation(self, tokens: List[Tuple[str, str]]) -> str:
         """Evaluate string concatenation."""
         if len(tokens) != 2:
             self.error("IVNGE requirit duos operandos", "IVNGE requires two operands")
         
+        variables = self.variables
         values = []
         for token_type, token_value in tokens:
             if token_type == 'STRING':
                 values.append(token_value)
             elif token_type == 'VARIABLE':
-                if token_value not in self.variables:
-                    self.error(f"'{token_value}' non declaratur", f"Variable '{token_value}' not declared")
-                var_val = self.variables[token_value]
+                if token_value in variables:
+                    var_val = variables[token_value]
+                else:
+                    var_val = self._variable_value(token_value)
                 if isinstance(var_val, int):
                     values.append(RomanNumeralParser.to_roman(var_val))
                 else:
@@ -1048,14 +1159,16 @@ class LatinInterpreter:
             self.error(f"{op} requirit duos operandos", f"{op} requires two operands")
         
         # Get string values
+        variables = self.variables
         values = []
         for token_type, token_value in tokens:
             if token_type == 'STRING':
                 values.append(token_value)
             elif token_type == 'VARIABLE':
-                if token_value not in self.variables:
-                    self.error(f"'{token_value}' non declaratur", f"Variable '{token_value}' not declared")
-                var_val = self.variables[token_value]
+                if token_value in variables:
+                    var_val = variables[token_value]
+                else:
+                    var_val = self._variable_value(token_value)
                 if isinstance(var_val, int):
                     self.error(f"{op} requirit textum", f"{op} requires strings")
                 values.append(var_val)
@@ -1082,46 +1195,52 @@ class LatinInterpreter:
         if len(tokens) != 2:
             self.error(f"{op} requirit duos operandos", f"{op} requires two operands")
         
-        values = []
-        for token_type, token_value in tokens:
-            if token_type == 'NUMBER':
-                values.append(token_value)
-            elif token_type == 'VARIABLE':
-                if token_value not in self.variables:
-                    self.error(f"'{token_value}' non declaratur", f"Variable '{token_value}' not declared")
-                values.append(self.variables[token_value])
-            else:
-                self.error(f"{op} requirit numeros aut variabiles", f"{op} requires numbers or variables")
-        
-        if op == 'ADDE':
-            return values[0] + values[1]
-        elif op == 'DEME':
-            return values[0] - values[1]
-        elif op == 'MVLTIPLICA':
-            return values[0] * values[1]
-        elif op == 'DVCE':
-            if values[1] == 0:
-                # Throw an ERROR exception that can be caught with CAPEERROR
-                if not self.exception_handlers:
-                    # No handler, use normal error
-                    self.error("Divisio per nihil", "Division by zero")
-                else:
-                    # Handler exists, throw catchable exception
-                    # Find ERROR handler
-                    for handler_type, handler_line in reversed(self.exception_handlers):
-                        if handler_type == 'ERROR':
-                            self.current_exception = {'type': 'ERROR', 'message': 'Divisio per nihil'}
-                            self.exception_throw_line = self.line_index + 1
-                            # Signal that we need to jump to handler
-                            raise LatinExceptionThrown(handler_line)
-                    # No ERROR handler found
-                    self.error("Divisio per nihil", "Division by zero")
-            return values[0] // values[1]
+        (left_type, left), (right_type, right) = tokens
+        # Number literals are used as they are and declared variables are read
+        # directly; anything else goes through the checked lookup
+        variables = self.variables
+        if left_type == 'VARIABLE' and left in variables:
+            left = variables[left]
+        elif left_type != 'NUMBER':
+            left = self._operand_value(op, left_type, left)
+        if right_type == 'VARIABLE' and right in variables:
+            right = variables[right]
+        elif right_type != 'NUMBER':
+            right = self._operand_value(op, right_type, right)
         
-        return 0
+        if op == 'DVCE' and right == 0:
+            # Throw an ERROR exception that can be caught with CAPEERROR
+            handler_line = self.find_handler('ERROR')
+            if handler_line is None:
+                # No ERROR handler, use normal error
+                self.error("Divisio per nihil", "Division by zero")
+            self.current_exception = {'type': 'ERROR', 'message': 'Divisio per nihil'}
+            self.exception_throw_line = self.line_index + 1
+            # Signal that we need to jump to handler
+            raise LatinExceptionThrown(handler_line)
+        
+        return self._ARITHMETIC_OPS[op](left, right)
+    
+    def _variable_value(self, var_name: str):
+        """Get the value of a declared variable."""
+        try:
+            return self.variables[var_name]
+        except KeyError:
+            self.error(f"'{var_name}' non declaratur", f"Variable '{var_name}' not declared")
+    
+    def _operand_value(self, op: str, token_type: str, token_value: str) -> int:
+        """Get the value of an arithmetic operand that is not a number literal."""
+        if token_type != 'VARIABLE':
+            self.error(f"{op} requirit numeros aut variabiles", f"{op} requires numbers or variables")
+        return self._variable_value(token_value)
     
-    def call_function(self, tokens: List[Tuple[str, str]]):
-        """Call a function with given arguments."""
+    def find_handler(self, exception_name: str) -> Optional[int]:
+        """Get the line of the innermost active handler for an exception, if any."""
+        handler_lines = self._handlers_by_name.get(exception_name)
+        return handler_lines[-1] if handler_lines else None
+    
+    def call_function(self, tokens: List[Tuple[str, str]], calling_var: Optional[str] = None):
+        """Call a function with given arguments, returning its value into calling_var."""
         if len(tokens) < 1:
             self.error("VOCA requirit nomen functionis", "VOCA requires function name")
         
@@ -1132,13 +1251,14 @@ class LatinInterpreter:
         func_name = tokens[0][1]
         
         # Check if function exists
-        if func_name not in self.functions:
+        func_def = self.functions.get(func_name)
+        if func_def is None:
             self.error(f"Functio '{func_name}' non definitur", f"Function '{func_name}' not defined")
         
-        func_def = self.functions[func_name]
         params = func_def['params']
         
         # Get arguments
+        variables = self.variables
         args = []
         for i in range(1, len(tokens)):
             token_type, token_value = tokens[i]
@@ -1147,9 +1267,10 @@ class LatinInterpreter:
             elif token_type == 'STRING':
                 args.append(token_value)
             elif token_type == 'VARIABLE':
-                if token_value not in self.variables:
-                    self.error(f"'{token_value}' non declaratur", f"Variable '{token_value}' not declared")
-                args.append(self.variables[token_value])
+                if token_value in variables:
+                    args.append(variables[token_value])
+                else:
+                    args.append(self._variable_value(token_value))
             else:
                 self.error("Argumenta invalida", "Invalid arguments")
         
@@ -1168,19 +1289,48 @@ class LatinInterpreter:
         # Save return address and variables on call stack
         self.call_stack.append({
             'return_line': self.line_index,
-            'saved_vars': saved_vars
+            'saved_vars': saved_vars,
+            'calling_var': calling_var
         })
         
         # Jump to function start
         return func_def['start_line']
 
 
+HISTORY_FILE = os.path.join(os.path.expanduser('~'), '.latin_history')
+
+
+def enable_line_editing():
+    """Give the REPL line editing and a history kept across sessions, if readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return
+    
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass  # No history yet
+    readline.set_history_length(1000)
+    
+    def save_history():
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+    atexit.register(save_history)
+
+
 def repl():
     """Interactive REPL for LATIN."""
     print("LATIN REPL - Latin Ain't This Insufferable Normally")
     print("Type 'VALE' to quit, 'ANGLICE' for English errors, 'LATINE' for Latin errors")
     print()
     
+    # Only a terminal session benefits from editing and history
+    if sys.stdin.isatty():
+        enable_line_editing()
+    
     interpreter = LatinInterpreter(use_english_errors=False)
     
     while True:
@@ -1205,8 +1355,10 @@ def repl():
                 continue
             
             # Execute single line
+            line = interpreter.COMMENT_PATTERN.sub('', line).strip()
             interpreter.line_index = 0
             interpreter.lines = [line]
+            interpreter.index_blocks()
             interpreter.execute_line(line)
             
         except KeyboardInterrupt:
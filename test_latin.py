@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Behavior tests for the LATIN interpreter.
+
+Run with: python3 -m unittest test_latin
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from latin import LatinInterpreter
+
+LATIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'latin.py')
+
+
+def run_program(source: str) -> str:
+    """Run LATIN source in this process and return what it printed."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        LatinInterpreter(use_english_errors=True).run(source)
+    return output.getvalue()
+
+
+class InputTest(unittest.TestCase):
+    """LEGO with the different kinds of stdin a program or the REPL can get."""
+
+    PROGRAM = 'SITNOMEN\nLEGONOMEN\nSCRIBENOMEN\nLEGONOMEN\nSCRIBENOMEN\n'
+
+    def setUp(self):
+        handle, self.program = tempfile.mkstemp(suffix='.lat')
+        with os.fdopen(handle, 'w') as f:
+            f.write(self.PROGRAM)
+
+    def tearDown(self):
+        os.remove(self.program)
+
+    def test_stdin_from_file(self):
+        with tempfile.TemporaryFile('w+') as stdin:
+            stdin.write('Marcus\nIulia\n')
+            stdin.seek(0)
+            result = subprocess.run([sys.executable, LATIN, self.program], stdin=stdin,
+                                    capture_output=True, text=True, timeout=10)
+        self.assertEqual(result.stdout, 'Marcus\nIulia\n')
+
+    def test_stdin_from_interactive_pipe(self):
+        # The second line is only sent once the first one has been echoed
+        proc = subprocess.Popen([sys.executable, LATIN, self.program], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True)
+        timer = threading.Timer(10, proc.kill)
+        timer.start()
+        try:
+            proc.stdin.write('Marcus\n')
+            proc.stdin.flush()
+            self.assertEqual(proc.stdout.readline(), 'Marcus\n')
+            proc.stdin.write('Iulia\n')
+            proc.stdin.close()
+            self.assertEqual(proc.stdout.read(), 'Iulia\n')
+            self.assertEqual(proc.wait(), 0)
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
+    def test_closed_stdin(self):
+        result = subprocess.run([sys.executable, LATIN, self.program], stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True, timeout=10)
+        self.assertIn('EOF when reading a line', result.stderr)
+        hello = os.path.join(os.path.dirname(LATIN), 'examples', 'hello.lat')
+        result = subprocess.run(f'"{sys.executable}" "{LATIN}" "{hello}" <&-', shell=True,
+                                capture_output=True, text=True, timeout=10)
+        self.assertEqual(result.stdout, 'XLII\n')
+
+    def test_piped_repl(self):
+        script = 'SITNUMERUS\nLEGONUMERUM\nV\nSCRIBENUMERUM\nSCRIBE"hi"\nVALE\n'
+        with tempfile.TemporaryFile('w+') as stdin:
+            stdin.write(script)
+            stdin.seek(0)
+            result = subprocess.run([sys.executable, LATIN], stdin=stdin,
+                                    capture_output=True, text=True, timeout=10)
+        self.assertEqual(result.stdout.replace('LATIN> ', '').splitlines()[-3:],
+                         ['V', 'hi', 'Vale! (Goodbye!)'])
+
+
+
+class CompiledLineTest(unittest.TestCase):
+    """Compiled lines are reused until SIT changes what a line means."""
+
+    # VIM reads as the numeral MIV until SITVI makes it VI's accusative
+    SOURCE = 'SCRIBEVIM\nSITVI\nSCRIBEVIM\nVIESTIII\nSCRIBEVIM\n'
+
+    def test_sit_recompiles_lines_in_program(self):
+        self.assertEqual(run_program(self.SOURCE), 'MIV\nNIHIL\nIII\n')
+
+    def test_sit_recompiles_lines_across_repl_turns(self):
+        interpreter = LatinInterpreter(use_english_errors=True)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for line in self.SOURCE.split():
+                interpreter.execute_line(line)
+        self.assertEqual(output.getvalue(), 'MIV\nNIHIL\nIII\n')
+
+
+class BlockTest(unittest.TestCase):
+    """Jumps over nested SI, ALITER and DUM blocks."""
+
+    def test_branches_inside_loop(self):
+        source = '\n'.join([
+            'SITNUMERUS',
+            'DUMNUMERUSMINORIV',
+            'SINUMERUSMINORII', 'SCRIBE"parvus"', 'ALITER', 'SCRIBE"magnus"', 'FINIS',
+            'NUMERUSESTADDENUMERUMI',
+            'FINIS',
+            'SCRIBENUMERUM',
+        ])
+        self.assertEqual(run_program(source), 'parvus\nparvus\nmagnus\nmagnus\nIV\n')
+
+    def test_skipped_blocks_hide_nested_blocks(self):
+        source = '\n'.join([
+            'SITNUMERUS', 'SITSUMMA', 'NUMERUSESTIII',
+            # A false SI skips a nested loop and lands in its ALITER branch
+            'SINUMERUSMINORI',
+            'DUMNUMERUSMINORX', 'SCRIBE"numquam"', 'FINIS',
+            'ALITER',
+            'DUMSUMMAMINORNUMERUS',
+            'SISUMMAAEQUATI', 'SCRIBE"unus"', 'FINIS',
+            'SUMMAESTADDESUMMAMI',
+            'FINIS',
+            'FINIS',
+            # A true SI runs its nested loop and skips its ALITER branch
+            'SINUMERUSAEQUATIII',
+            'DUMSUMMAMINORV', 'SUMMAESTADDESUMMAMI', 'FINIS',
+            'ALITER', 'SCRIBE"numquam"',
+            'FINIS',
+            # A false DUM skips a nested SI together with its ALITER branch
+            'DUMNUMERUSMINORI',
+            'SINUMERUSAEQUATIII', 'SCRIBE"numquam"', 'ALITER', 'SCRIBE"numquam"', 'FINIS',
+            'SCRIBE"numquam"',
+            'FINIS',
+            'SCRIBESUMMAM',
+        ])
+        self.assertEqual(run_program(source), 'unus\nV\n')
+
+
+class ExceptionTest(unittest.TestCase):
+    """CAPE handlers for IACE and division by zero."""
+
+    def test_innermost_handler_for_name_catches(self):
+        source = '\n'.join([
+            'SITERROR', 'SITCAVSA', 'SITNUMERUS',
+            'CAPEERROR', 'SCRIBE"exterior"', 'FINIS',
+            'CAPECAVSA', 'SCRIBE"causa"', 'FINIS',
+            'CAPEERROR', 'SCRIBE"interior"', 'FINIS',
+            'SCRIBE"ante"',
+            'NUMERUSESTDVCENUMERUMNIHIL',
+            'SCRIBE"post"',
+        ])
+        self.assertEqual(run_program(source), 'ante\ninterior\n')
+
+    def test_handler_for_thrown_name_catches(self):
+        # The ERROR handler is newer, but only the CAVSA handler matches
+        source = '\n'.join([
+            'SITERROR', 'SITCAVSA', 'SITNUMERUS',
+            'CAPECAVSA', 'SCRIBE"causa"', 'NUMERUSESTI', 'FINIS',
+            'CAPEERROR', 'SCRIBE"error"', 'FINIS',
+            'SINUMERUSAEQUATNIHIL', 'IACECAVSA"a"', 'FINIS',
+            'SCRIBE"post"',
+        ])
+        self.assertEqual(run_program(source), 'causa\n')
+
+    def test_handler_body_is_skipped_when_declared(self):
+        source = '\n'.join([
+            'SITERROR', 'SITNUMERUS',
+            'CAPEERROR', 'SINUMERUSAEQUATNIHIL', 'SCRIBE"captum"', 'FINIS', 'SCRIBE"numquam"', 'FINIS',
+            'SCRIBE"ante"',
+            'IACEERROR"a"',
+            'SCRIBE"post"',
+        ])
+        self.assertEqual(run_program(source), 'ante\ncaptum\n')
+
+
+class FunctionTest(unittest.TestCase):
+    """VOCA and REDDO."""
+
+    def test_nested_call_returns_to_own_target(self):
+        # The outer call's value goes to SUMMA even though the inner call
+        # returned into RESULTAT, which the outer return then restores
+        source = '\n'.join([
+            'SITADDITOR', 'SITDOCTOR', 'SITPRIMUS', 'SITSECUNDUS', 'SITRESULTAT', 'SITSUMMA',
+            'FACADDITORPRIMO', 'REDDOPRIMUM', 'FINIS',
+            'FACDOCTORSECUNDO', 'RESULTATESTVOCAADDITOREMSECUNDUM', 'REDDORESULTAT', 'FINIS',
+            'SUMMAESTVOCADOCTOREMX', 'SCRIBESUMMA', 'SCRIBERESULTAT',
+        ])
+        self.assertEqual(run_program(source), 'X\nNIHIL\n')
+
+    def test_recursive_call(self):
+        source = '\n'.join([
+            'SITDOCTOR', 'SITNUMERUS', 'SITPRIOR', 'SITPRODUCTUM', 'SITRESULTAT',
+            'FACDOCTORNUMERO',
+            'SINUMERUSMINORII', 'REDDOI', 'FINIS',
+            'PRIORESTDEMENUMERUMI',
+            'PRODUCTUMESTVOCADOCTOREMPRIOREM',
+            'PRODUCTUMESTMVLTIPLICANUMERUMPRODUCTUM',
+            'REDDOPRODUCTUM', 'FINIS',
+            'RESULTATESTVOCADOCTOREMV', 'SCRIBERESULTAT',
+        ])
+        self.assertEqual(run_program(source), 'CXX\n')
+
+
+if __name__ == '__main__':
+    unittest.main()